@@ -2,15 +2,27 @@
 
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Base URL of the server
 SERVER_URL = "http://127.0.0.1:5000"
 USER_ID = "main_user"  # Unique identifier for this client
 
+# Reuse one session for all requests so the TCP connection to the server
+# is kept alive instead of paying a new handshake on every chat turn
+SESSION = requests.Session()
+SESSION.headers.update({"X-User-Id": USER_ID})
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
 def check_auth():
     """Contact the server to check if the user is logged in."""
     try:
-        response = requests.get(f"{SERVER_URL}/check_auth", params={'user_id': USER_ID})
+        response = SESSION.get(f"{SERVER_URL}/check_auth", params={'user_id': USER_ID}, timeout=5)
         response.raise_for_status()
         data = response.json()
         if data.get("logged_in"):
@@ -34,7 +46,7 @@ def chat_with_bot(prompt):
     """Sends a chat message to the server and receives the response."""
     try:
         payload = {"user_id": USER_ID, "prompt": prompt}
-        response = requests.post(f"{SERVER_URL}/chat", json=payload)
+        response = SESSION.post(f"{SERVER_URL}/chat", json=payload, timeout=60)
         response.raise_for_status()
         return response.json().get("response", "No response received.")
     except requests.exceptions.HTTPError as e:
@@ -49,32 +61,36 @@ def chat_with_bot(prompt):
 def main():
     """Main client loop."""
     print("--- Welcome to the GitHub AI Agent ---")
-    
-    # Check authentication status on startup
-    if not check_auth():
-        print("\nPlease restart this client after logging in.")
-        return
 
-    print("\nYou can start chatting with the bot. Type 'exit' to quit.")
-    print("Examples: 'meri public repos list karo' or 'ek test repo banao'")
-    
-    while True:
-        try:
-            prompt = input("\nYou: ")
-            if prompt.lower() == 'exit':
-                print("Goodbye!")
-                break
-            
-            if not prompt:
-                continue
+    try:
+        # Check authentication status on startup
+        if not check_auth():
+            print("\nPlease restart this client after logging in.")
+            return
+
+        print("\nYou can start chatting with the bot. Type 'exit' to quit.")
+        print("Examples: 'meri public repos list karo' or 'ek test repo banao'")
 
-            print("Bot: Thinking...")
-            response = chat_with_bot(prompt)
-            print(f"Bot: {response}")
+        while True:
+            try:
+                prompt = input("\nYou: ")
+                if prompt.lower() == 'exit':
+                    print("Goodbye!")
+                    break
 
-        except KeyboardInterrupt:
-            print("\nGoodbye!")
-            break
+                if not prompt:
+                    continue
+
+                print("Bot: Thinking...")
+                response = chat_with_bot(prompt)
+                print(f"Bot: {response}")
+
+            except KeyboardInterrupt:
+                print("\nGoodbye!")
+                break
+    finally:
+        # Release the pooled connections when the client exits
+        SESSION.close()
 
 if __name__ == "__main__":
     main()
@@ -1,84 +1,204 @@
 # server/gemini_handler.py
 
+import asyncio
+import collections
+import functools
+import threading
+
 import google.generativeai as genai
 from google.generativeai.types import GenerationConfig, Tool
+from google.protobuf.json_format import MessageToDict
+
+from llm_cache import LLMCache, make_key
+
+def _string(description):
+    """Shorthand for a string parameter schema."""
+    return {'type': 'string', 'description': description}
+
+
+def _coerce_ints(value):
+    """Turns integral floats from a proto Struct back into ints, recursively.
+
+    Struct numbers are all doubles, so MessageToDict renders an
+    integer-typed arg like issue_number=5 as 5.0; none of the declared
+    tools take a true float, so whole numbers are safe to restore.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _coerce_ints(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_coerce_ints(v) for v in value]
+    return value
+
+
+# Property schemas shared across declarations; each exists once in memory
+# and once in the serialised schema sent to Gemini
+_REPO = _string("Full name of the repository (e.g. 'username/repo-name').")
+_USERNAME = _string("GitHub username of the user.")
+_COMMIT_MESSAGE = _string("Commit message.")
+_QUERY = _string("Query or keyword to search for.")
+_MAX_RESULTS = {'type': 'integer', 'description': "Maximum number of results to return (default 100)."}
+
+# Define tools (function declarations) for GitHub operations
+# This tells Gemini which functions are available.
+# All operations from your list have been added.
+# Built once at import time so every GeminiHandler shares the same objects.
+_DECLS = [
+    # User and Authentication
+    {'name': 'get_user_info', 'description': "Get authenticated user's GitHub information."},
+    {'name': 'get_any_user_info', 'description': "Get public information of any GitHub user.", 'parameters': {'type': 'object', 'properties': {'username': _USERNAME}, 'required': ['username']}},
+
+    # Repository Operations
+    {'name': 'list_repos', 'description': "List all repositories of the user.", 'parameters': {'type': 'object', 'properties': {'visibility': _string("Visibility of the repository ('all', 'public', 'private')"), 'max_results': _MAX_RESULTS}}},
+    {'name': 'create_repo', 'description': "Create a new GitHub repository.", 'parameters': {'type': 'object', 'properties': {'name': _string("Name of the repository."), 'description': _string("Description of the repository."), 'private': {'type': 'boolean', 'description': "Whether the repository should be private."}}, 'required': ['name']}},
+    {'name': 'delete_repo', 'description': "Delete a GitHub repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO}, 'required': ['repo_full_name']}},
+    {'name': 'fork_repo', 'description': "Fork another user's repository into your account.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO}, 'required': ['repo_full_name']}},
+    {'name': 'get_repo_stats', 'description': "Get stats (stars, forks, watchers) of a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO}, 'required': ['repo_full_name']}},
+
+    # File and Content Management
+    {'name': 'list_files', 'description': "List contents of a folder in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'path': _string("Path of the file or folder to view. Leave empty for root."), 'max_results': _MAX_RESULTS}, 'required': ['repo_full_name']}},
+    {'name': 'get_file_content', 'description': "Read the content of a file in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'file_path': _string("Path of the file to read.")}, 'required': ['repo_full_name', 'file_path']}},
+    {'name': 'create_file', 'description': "Create a new file in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'file_path': _string("Path of the file to create."), 'commit_message': _COMMIT_MESSAGE, 'content': _string("Content of the file.")}, 'required': ['repo_full_name', 'file_path', 'commit_message', 'content']}},
+    {'name': 'update_file', 'description': "Update an existing file in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'file_path': _string("Path of the file to update."), 'commit_message': _COMMIT_MESSAGE, 'content': _string("New file content.")}, 'required': ['repo_full_name', 'file_path', 'commit_message', 'content']}},
+    {'name': 'commit_files', 'description': "Create or update several files in a repository with a single commit.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'changes': {'type': 'array', 'description': "Files to write.", 'items': {'type': 'object', 'properties': {'file_path': _string("Path of the file."), 'content': _string("Content of the file.")}, 'required': ['file_path', 'content']}}, 'commit_message': _COMMIT_MESSAGE, 'branch': _string("Branch to commit to (default 'main').")}, 'required': ['repo_full_name', 'changes', 'commit_message']}},
+    {'name': 'delete_file', 'description': "Delete a file from a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'file_path': _string("Path of the file to delete."), 'commit_message': _COMMIT_MESSAGE}, 'required': ['repo_full_name', 'file_path', 'commit_message']}},
+
+    # Collaborators
+    {'name': 'list_collaborators', 'description': 'List all collaborators of a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'max_results': _MAX_RESULTS}, 'required': ['repo_full_name']}},
+    {'name': 'add_collaborator', 'description': 'Add a collaborator to a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'username': _USERNAME, 'permission': _string("Permission level ('pull', 'push', 'admin')")}, 'required': ['repo_full_name', 'username']}},
+    {'name': 'remove_collaborator', 'description': 'Remove a collaborator from a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'username': _USERNAME}, 'required': ['repo_full_name', 'username']}},
+
+    # Issues
+    {'name': 'create_issue', 'description': 'Create a new issue in a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'title': _string("Title of the issue."), 'body': _string("Optional description of the issue."), 'assignee': _string("Username to assign the issue to (optional).")}, 'required': ['repo_full_name', 'title']}},
+    {'name': 'list_issues', 'description': 'List issues of a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'state': _string("State of the issue ('open', 'closed', 'all')."), 'max_results': _MAX_RESULTS}, 'required': ['repo_full_name']}},
+    {'name': 'close_issue', 'description': 'Close an issue.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'issue_number': {'type': 'integer', 'description': "Number of the issue to close."}}, 'required': ['repo_full_name', 'issue_number']}},
+
+    # Branches
+    {'name': 'list_branches', 'description': 'List all branches of a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'max_results': _MAX_RESULTS}, 'required': ['repo_full_name']}},
+    {'name': 'create_branch', 'description': 'Create a new branch in a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': _REPO, 'branch_name': _string("Name of the new branch."), 'source_branch': _string("Name of the source branch (e.g. 'main').")}, 'required': ['repo_full_name', 'branch_name', 'source_branch']}},
+
+    # Search
+    {'name': 'search_repos', 'description': 'Search for repositories on GitHub by keyword.', 'parameters': {'type': 'object', 'properties': {'query': _QUERY}, 'required': ['query']}},
+    {'name': 'search_users', 'description': 'Search for users on GitHub by keyword.', 'parameters': {'type': 'object', 'properties': {'query': _QUERY}, 'required': ['query']}},
+]
+
+_GITHUB_TOOLS = Tool(function_declarations=_DECLS)
+
+# Every operation the model is allowed to request, straight from the
+# declarations so the two cannot drift apart
+TOOL_NAMES = frozenset(fn['name'] for fn in _DECLS)
+
+_MODEL_NAME = 'gemini-1.5-flash'
+_TEMPERATURE = 0
+_TOOL_NAMES = [fn['name'] for fn in _DECLS]
+
+# What get_github_operation hands back: the tool name plus its arguments
+# as a plain dict, converted from the proto exactly once
+FunctionCall = collections.namedtuple("FunctionCall", ["name", "args"])
+
+# With temperature=0 a prompt sent to an *empty* chat session always
+# yields the same tool-call, so those can be answered from cache; once a
+# session has history the same text can mean something else entirely
+# ("delete it"), so contextual prompts are never cached
+_FN_CACHE = LLMCache(maxsize=1024, ttl=600)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_model(api_key):
+    """Configures Gemini and builds the model once per API key."""
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        model_name=_MODEL_NAME,
+        generation_config=GenerationConfig(temperature=_TEMPERATURE),
+        tools=[_GITHUB_TOOLS]
+    )
+
 
 class GeminiHandler:
     """Class to handle interaction with Google Gemini LLM."""
 
     def __init__(self, api_key):
-        """Configures and initializes the Gemini model."""
+        """Initializes the (shared) Gemini model."""
         if not api_key:
             raise ValueError("Gemini API key not provided.")
-        genai.configure(api_key=api_key)
-        
-        # Define tools (function declarations) for GitHub operations
-        # This tells Gemini which functions are available.
-        # All operations from your list have been added.
-        self.github_tools = Tool(
-            function_declarations=[
-                # User and Authentication
-                {'name': 'get_user_info', 'description': "Get authenticated user's GitHub information."},
-                {'name': 'get_any_user_info', 'description': "Get public information of any GitHub user.", 'parameters': {'type': 'object', 'properties': {'username': {'type': 'string', 'description': 'GitHub username of the user.'}}, 'required': ['username']}},
-
-                # Repository Operations
-                {'name': 'list_repos', 'description': "List all repositories of the user.", 'parameters': {'type': 'object', 'properties': {'visibility': {'type': 'string', 'description': "Visibility of the repository ('all', 'public', 'private')"}}}},
-                {'name': 'create_repo', 'description': "Create a new GitHub repository.", 'parameters': {'type': 'object', 'properties': {'name': {'type': 'string', 'description': "Name of the repository."}, 'description': {'type': 'string', 'description': "Description of the repository."}, 'private': {'type': 'boolean', 'description': "Whether the repository should be private."}}, 'required': ['name']}},
-                {'name': 'delete_repo', 'description': "Delete a GitHub repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository to delete (e.g. 'username/repo-name')"}}, 'required': ['repo_full_name']}},
-                {'name': 'fork_repo', 'description': "Fork another user's repository into your account.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository to fork (e.g. 'owner/repo-name')"}}, 'required': ['repo_full_name']}},
-                {'name': 'get_repo_stats', 'description': "Get stats (stars, forks, watchers) of a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}}, 'required': ['repo_full_name']}},
-
-                # File and Content Management
-                {'name': 'list_files', 'description': "List contents of a folder in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'path': {'type': 'string', 'description': "Path of the file or folder to view. Leave empty for root."}}, 'required': ['repo_full_name']}},
-                {'name': 'get_file_content', 'description': "Read the content of a file in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'file_path': {'type': 'string', 'description': "Path of the file to read."}}, 'required': ['repo_full_name', 'file_path']}},
-                {'name': 'create_file', 'description': "Create a new file in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'file_path': {'type': 'string', 'description': "Path of the file to create."}, 'commit_message': {'type': 'string', 'description': "Commit message."}, 'content': {'type': 'string', 'description': "Content of the file."}}, 'required': ['repo_full_name', 'file_path', 'commit_message', 'content']}},
-                {'name': 'update_file', 'description': "Update an existing file in a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'file_path': {'type': 'string', 'description': "Path of the file to update."}, 'commit_message': {'type': 'string', 'description': "Commit message."}, 'content': {'type': 'string', 'description': "New file content."}}, 'required': ['repo_full_name', 'file_path', 'commit_message', 'content']}},
-                {'name': 'delete_file', 'description': "Delete a file from a repository.", 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'file_path': {'type': 'string', 'description': "Path of the file to delete."}, 'commit_message': {'type': 'string', 'description': "Commit message."}}, 'required': ['repo_full_name', 'file_path', 'commit_message']}},
-
-                # Collaborators
-                {'name': 'list_collaborators', 'description': 'List all collaborators of a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository"}}, 'required': ['repo_full_name']}},
-                {'name': 'add_collaborator', 'description': 'Add a collaborator to a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository"}, 'username': {'type': 'string', 'description': "Username of the collaborator"}, 'permission': {'type': 'string', 'description': "Permission level ('pull', 'push', 'admin')"}}, 'required': ['repo_full_name', 'username']}},
-                {'name': 'remove_collaborator', 'description': 'Remove a collaborator from a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository"}, 'username': {'type': 'string', 'description': "Username of the collaborator to remove"}}, 'required': ['repo_full_name', 'username']}},
-
-                # Issues
-                {'name': 'create_issue', 'description': 'Create a new issue in a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'title': {'type': 'string', 'description': "Title of the issue."}, 'body': {'type': 'string', 'description': "Optional description of the issue."}, 'assignee': {'type': 'string', 'description': "Username to assign the issue to (optional)."}}, 'required': ['repo_full_name', 'title']}},
-                {'name': 'list_issues', 'description': 'List issues of a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'state': {'type': 'string', 'description': "State of the issue ('open', 'closed', 'all')."}}, 'required': ['repo_full_name']}},
-                {'name': 'close_issue', 'description': 'Close an issue.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'issue_number': {'type': 'integer', 'description': "Number of the issue to close."}}, 'required': ['repo_full_name', 'issue_number']}},
-
-                # Branches
-                {'name': 'list_branches', 'description': 'List all branches of a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}}, 'required': ['repo_full_name']}},
-                {'name': 'create_branch', 'description': 'Create a new branch in a repository.', 'parameters': {'type': 'object', 'properties': {'repo_full_name': {'type': 'string', 'description': "Full name of the repository."}, 'branch_name': {'type': 'string', 'description': "Name of the new branch."}, 'source_branch': {'type': 'string', 'description': "Name of the source branch (e.g. 'main')."}}, 'required': ['repo_full_name', 'branch_name', 'source_branch']}},
-
-                # Search
-                {'name': 'search_repos', 'description': 'Search for repositories on GitHub by keyword.', 'parameters': {'type': 'object', 'properties': {'query': {'type': 'string', 'description': "Query or keyword to search for."}}, 'required': ['query']}},
-                {'name': 'search_users', 'description': 'Search for users on GitHub by keyword.', 'parameters': {'type': 'object', 'properties': {'query': {'type': 'string', 'description': "Query or keyword to search for."}}, 'required': ['query']}},
-            ]
-        )
-        
-        # Initialize the Gemini model
-        self.model = genai.GenerativeModel(
-            model_name='gemini-1.5-flash',
-            generation_config=GenerationConfig(temperature=0),
-            tools=[self.github_tools]
-        )
-
-    def get_github_operation(self, prompt: str):
+        self.github_tools = _GITHUB_TOOLS
+        self.model = _get_model(api_key)
+        # One chat session per user, so the tool schema is not
+        # re-serialised on every prompt
+        self._chat_sessions = {}
+        # Per-user locks for the async path; a chat session is not safe
+        # to use from two prompts at once. These are threading locks, not
+        # asyncio ones: each Flask async view runs in its own short-lived
+        # event loop, and an asyncio.Lock cached across loops never wakes
+        # waiters from the other loop.
+        self._session_locks = {}
+        self._locks_guard = threading.Lock()
+
+    def session_is_fresh(self, user_id: str) -> bool:
+        """True when the user's chat session has no history yet.
+
+        Only prompts sent to a fresh session are deterministic; callers
+        should not cache tool-calls for users with conversation context.
+        """
+        session = self._chat_sessions.get(user_id)
+        return not (session and session.history)
+
+    def get_github_operation(self, prompt: str, user_id: str = "main_user"):
         """
         Calls Gemini to analyze the user prompt and determine which GitHub function to call.
         """
+        # Caching is only safe while the model is deterministic AND the
+        # session has no history; a contextual prompt resolves against
+        # whatever was said before, so it must always reach the model
+        use_cache = _TEMPERATURE == 0 and self.session_is_fresh(user_id)
+        if use_cache:
+            key = make_key(_MODEL_NAME, prompt, _TOOL_NAMES)
+            cached = _FN_CACHE.get(key)
+            if cached is not None:
+                return FunctionCall(name=cached["name"], args=cached["args"])
+
         try:
-            # Start chat session
-            chat_session = self.model.start_chat()
-            
+            # Reuse the user's chat session (created on first prompt)
+            chat_session = self._chat_sessions.setdefault(user_id, self.model.start_chat())
+
             # Send prompt
             response = chat_session.send_message(prompt)
-            
+
             # Check if the model returns a function call
-            if response.candidates[0].content.parts[0].function_call:
-                return response.candidates[0].content.parts[0].function_call
-            
+            function_call = response.candidates[0].content.parts[0].function_call
+            if function_call:
+                # Walk the proto Struct once; every later access is then a
+                # plain dict lookup. Integral floats are restored to ints
+                # here so handlers never see 5.0 for an integer arg.
+                args = _coerce_ints(MessageToDict(
+                    function_call._pb,
+                    preserving_proto_field_name=True).get("args", {}))
+                if use_cache:
+                    _FN_CACHE.set(key, {"name": function_call.name, "args": args})
+                return FunctionCall(name=function_call.name, args=args)
+
             return None # If no function call found
-            
+
         except Exception as e:
             print(f"Error in getting response from Gemini: {e}")
+            # Drop the session so a broken connection does not stick around
+            self._chat_sessions.pop(user_id, None)
             return None
+
+    async def get_github_operation_async(self, prompt: str, user_id: str = "main_user"):
+        """
+        Async variant: offloads the blocking Gemini round-trip to a thread so
+        prompts from different users can be in flight concurrently (e.g. via
+        asyncio.gather). Prompts from the same user stay serialised because a
+        chat session cannot handle two messages at once; the lock is taken
+        inside the worker thread so it works across request event loops.
+        """
+        with self._locks_guard:
+            lock = self._session_locks.setdefault(user_id, threading.Lock())
+        return await asyncio.to_thread(self._serialised_operation, lock, prompt, user_id)
+
+    def _serialised_operation(self, lock, prompt, user_id):
+        """Runs get_github_operation under the user's session lock."""
+        with lock:
+            return self.get_github_operation(prompt, user_id)
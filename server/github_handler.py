@@ -1,6 +1,136 @@
 # server/github_handler.py
 
-from github import Github, GithubException, UnknownObjectException
+import functools
+import itertools
+import json
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from github import Github, GithubException, InputGitTreeElement, UnknownObjectException
+from github.GithubObject import NotSet
+
+from rate_limiter import RateLimiter
+
+# Base URL for direct GitHub REST calls
+_API_ROOT = "https://api.github.com"
+
+# Shared across all handlers: the API budget belongs to the process,
+# not to any single token's handler
+_LIMITER = RateLimiter()
+
+# Page size PyGithub requests from the API
+_PER_PAGE = 100
+
+# How long a fetched repository object may be reused (seconds)
+_REPO_TTL = 60
+
+# How long read-only handler results may be reused (seconds)
+_READ_TTL = 30
+
+# Pre-built reply templates; one format call per reply instead of
+# stitching together f-string segments
+_USER_TMPL = ("Logged in user: {login} ({name})\n"
+              "Public Repos: {public_repos}\n"
+              "Private Repos (Owned): {owned_private_repos}\n"
+              "Followers: {followers}")
+_ANY_USER_TMPL = ("User: {login} ({name})\n"
+                  "Bio: {bio}\n"
+                  "Public Repos: {public_repos}\n"
+                  "Followers: {followers}")
+_REPO_STATS_TMPL = ("Stats for '{full_name}':\n"
+                    "  - Stars: {stars}\n"
+                    "  - Forks: {forks}\n"
+                    "  - Watchers: {watchers}\n"
+                    "  - Language: {language}")
+
+
+def _ttl_cache(method):
+    """Caches a read-only handler's result per instance for _READ_TTL seconds.
+
+    Agents tend to repeat reads ('list my repos' twice in a row); a hit
+    skips the GitHub round-trip entirely and does not count against the
+    rate limit. Mutating handlers invalidate via _invalidate_reads.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        with self._read_lock:
+            try:
+                return self._read_cache[key]
+            except KeyError:
+                pass
+        result = method(self, *args, **kwargs)
+        with self._read_lock:
+            self._read_cache[key] = result
+        return result
+    return wrapper
+
+
+def _last_page(link_header):
+    """Extracts the last page number from a Link response header (1 if absent)."""
+    if not link_header:
+        return 1
+    for part in link_header.split(","):
+        if 'rel="last"' in part:
+            match = re.search(r'[?&]page=(\d+)', part)
+            if match:
+                return int(match.group(1))
+    return 1
+
+
+def _raw(item, attr):
+    """Reads a PyGithub attribute without triggering a lazy refetch.
+
+    List payloads already carry fields like full_name and login, but going
+    through the public property can make PyGithub complete the whole object
+    with an extra GET per item. Read the private slot directly and only fall
+    back to the property if the field was genuinely missing from the page.
+    """
+    value = getattr(item, f"_{attr}", None)
+    if value is not None and value is not NotSet:
+        return value.value
+    return getattr(item, attr)
+
+
+def _parallel_map(paginated, fn, workers=8, limit=None):
+    """Applies fn to every item of a PaginatedList, fetching pages concurrently.
+
+    PyGithub normally walks pages one blocking request at a time; fetching
+    them in a small thread pool overlaps the network round-trips. Workers are
+    capped at 8 to stay well within GitHub's rate limits. A limit bounds both
+    the pages fetched and the items returned, so nothing is downloaded past
+    what the caller will show.
+
+    Page 0 is fetched first; only when it comes back full (so more pages
+    may exist) is totalCount consulted, since that property costs a probe
+    request of its own and the common listing fits in one page.
+    """
+    if limit is not None:
+        # Gemini delivers integer args as proto floats (5 -> 5.0); coerce
+        # so the slices below get a real index
+        limit = int(limit)
+    first = paginated.get_page(0)
+    if len(first) < _PER_PAGE or (limit is not None and limit <= len(first)):
+        # One page covers it: no probe, no threads
+        return [fn(item) for item in first[:limit]]
+    total = paginated.totalCount
+    if limit is not None:
+        total = min(total, limit)
+    pages = math.ceil(total / _PER_PAGE)
+    with ThreadPoolExecutor(max_workers=min(workers, pages - 1)) as executor:
+        fetched = executor.map(paginated.get_page, range(1, pages))
+        items = first + [item for page in fetched for item in page]
+    return [fn(item) for item in items[:total]]
+
 
 class GitHubHandler:
     """Handles all interactions with the GitHub API using PyGithub."""
@@ -9,63 +139,235 @@ class GitHubHandler:
         """Initializes an authenticated GitHub object."""
         if not token:
             raise ValueError("GitHub access token not provided.")
-        self.g = Github(token)
+        # per_page=100 cuts the number of pages fetched by listings 3x;
+        # the sized pool keeps keep-alive working under _parallel_map bursts
+        self.g = Github(
+            token,
+            per_page=_PER_PAGE,
+            pool_size=64,
+            retry=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504],
+                        respect_retry_after_header=True),
+        )
+        # Pooled keep-alive session for direct REST calls, so the 2-3
+        # back-to-back API calls of a single prompt reuse one connection
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+        })
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+        # Blob SHAs from recent reads/writes, keyed by (repo, path); lets
+        # update/delete skip the get_contents lookup GitHub needs a SHA for
+        self._sha_cache = {}
+        # Recently fetched repo objects, keyed by full name; spares the
+        # GET /repos/{full} every handler starts with
+        self._repo_cache = {}
+        # Results of read-only handlers (see _ttl_cache)
+        self._read_cache = TTLCache(maxsize=1024, ttl=_READ_TTL)
+        self._read_lock = threading.RLock()
+        # ETag-validated responses for direct REST GETs; a 304 revalidation
+        # is free against the rate limit
+        self._etag_cache = TTLCache(maxsize=256, ttl=600)
+        # Lowercased full names of the repos the user owns, built lazily;
+        # answers ownership checks without a lookup request
+        self._owned_repos = None
         try:
             self.user = self.g.get_user()
+            # Force the single GET /user here; ownership checks then use a
+            # plain string instead of a lazy PyGithub attribute
+            self.user_login = self.user.login
         except GithubException as e:
             raise Exception(f"Invalid GitHub token or unable to access API: {e.status}") from e
 
-    # --- Helper Function ---
+    # --- Helper Functions ---
     def _get_repo(self, repo_full_name):
-        """Helper to get a repository object and handle 404 errors."""
+        """Helper to get a repository object and handle 404 errors.
+
+        Repo objects are cached for a short TTL so repeated operations on
+        the same repository within a session skip the lookup request.
+        """
+        entry = self._repo_cache.get(repo_full_name)
+        if entry and time.monotonic() - entry[0] < _REPO_TTL:
+            return entry[1]
         try:
-            return self.g.get_repo(repo_full_name)
+            repo = self.g.get_repo(repo_full_name)
         except UnknownObjectException:
+            self._repo_cache.pop(repo_full_name, None)
             return None
+        self._repo_cache[repo_full_name] = (time.monotonic(), repo)
+        return repo
+
+    def _get_repo_lazy(self, repo_full_name):
+        """Helper to get a repository object without a validation request.
+
+        The returned object issues no request of its own; the first real
+        API call on it carries the 404 if the repository does not exist,
+        saving one round-trip on the happy path.
+        """
+        return self.g.get_repo(repo_full_name, lazy=True)
+
+    def _limited_request(self, method, path, **kwargs):
+        """Sends a throttled request, retrying 403/429 with backoff.
+
+        Search endpoints draw from their own (much smaller) budget.
+        """
+        resource = "search" if path.startswith("/search/") else "core"
+        response = None
+        for attempt in range(4):
+            _LIMITER.acquire(resource)
+            try:
+                response = self._session.request(method, f"{_API_ROOT}{path}", **kwargs)
+                _LIMITER.update(response.headers, resource)
+            finally:
+                _LIMITER.release()
+            # A 403 is only worth retrying when it actually is a rate
+            # limit; permission 403s (missing scope, SAML) never change
+            rate_limited = (response.status_code == 429
+                            or (response.status_code == 403
+                                and ("Retry-After" in response.headers
+                                     or response.headers.get("x-ratelimit-remaining") == "0")))
+            if not rate_limited or attempt == 3:
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                delay = 0.5 * (2 ** attempt)
+            time.sleep(delay)
+        return response
+
+    def _rest_get(self, path, params=None, headers=None, timeout=10):
+        """Performs a GET against the GitHub REST API on the shared session.
+
+        Responses are remembered with their ETag and revalidated via
+        If-None-Match; GitHub answers an unchanged resource with a 304,
+        which carries no body and does not count against the rate limit,
+        so the cached response is reused.
+        """
+        key = (path, tuple(sorted((params or {}).items())),
+               tuple(sorted((headers or {}).items())))
+        entry = self._etag_cache.get(key)
+        headers = dict(headers or {})
+        if entry:
+            headers["If-None-Match"] = entry[0]
+        response = self._limited_request("GET", path, params=params,
+                                         headers=headers or None, timeout=timeout)
+        if entry and response.status_code == 304:
+            return entry[1]
+        etag = response.headers.get("ETag")
+        if etag and response.ok:
+            self._etag_cache[key] = (etag, response)
+        return response
+
+    def _rest_paged(self, path, params=None, workers=10, max_results=None):
+        """Fetches a paginated REST collection, pulling pages 2..N concurrently.
+
+        Page 1 is fetched alone to learn the last page from the Link header;
+        the rest are then fanned out on the shared session, so a K-page
+        listing costs roughly one round-trip of wall-clock instead of K.
+        Returns the concatenated JSON items.
+        """
+        params = dict(params or {})
+        params.setdefault("per_page", _PER_PAGE)
+        if max_results is not None:
+            # Proto integer args arrive as floats; slicing needs an int
+            max_results = int(max_results)
+        first = self._rest_get(path, params)
+        first.raise_for_status()
+        items = first.json()
+        last = _last_page(first.headers.get("Link"))
+        if max_results is not None:
+            last = min(last, math.ceil(max_results / params["per_page"]))
+        if last > 1:
+            def fetch(page):
+                return self._rest_get(path, {**params, "page": page}).json()
+            with ThreadPoolExecutor(max_workers=min(workers, last - 1)) as executor:
+                for page_items in executor.map(fetch, range(2, last + 1)):
+                    items.extend(page_items)
+        return items[:max_results] if max_results is not None else items
+
+    def _invalidate_reads(self, repo_full_name=None):
+        """Drops cached read results, or only those touching one repository."""
+        with self._read_lock:
+            if repo_full_name is None:
+                self._read_cache.clear()
+                return
+            stale = [key for key in self._read_cache
+                     if repo_full_name in key[1]
+                     or ("repo_full_name", repo_full_name) in key[2]]
+            for key in stale:
+                self._read_cache.pop(key, None)
 
     # --- User and Authentication ---
     def get_user_info(self):
         """Returns information about the authenticated user."""
-        return (f"Logged in user: {self.user.login} ({self.user.name})\n"
-                f"Public Repos: {self.user.public_repos}\n"
-                f"Private Repos (Owned): {self.user.owned_private_repos}\n"
-                f"Followers: {self.user.followers}")
+        return _USER_TMPL.format(login=self.user.login, name=self.user.name,
+                                 public_repos=self.user.public_repos,
+                                 owned_private_repos=self.user.owned_private_repos,
+                                 followers=self.user.followers)
     
+    @_ttl_cache
     def get_any_user_info(self, username: str):
         """Fetches public information of any user."""
         try:
             user = self.g.get_user(username)
-            return (f"User: {user.login} ({user.name})\n"
-                    f"Bio: {user.bio}\n"
-                    f"Public Repos: {user.public_repos}\n"
-                    f"Followers: {user.followers}")
+            return _ANY_USER_TMPL.format(login=user.login, name=user.name, bio=user.bio,
+                                         public_repos=user.public_repos,
+                                         followers=user.followers)
         except UnknownObjectException:
             return f"Error: User '{username}' not found."
 
     # --- Repository Operations ---
-    def list_repos(self, visibility='all'):
+    @_ttl_cache
+    def list_repos(self, visibility='all', max_results: int = 100):
         """Returns list of user's repositories."""
-        repos = self.user.get_repos(affiliation='owner', visibility=visibility)
-        repo_names = [repo.full_name for repo in repos]
-        if not repo_names: return f"You have no '{visibility}' repositories."
-        return f"Your {visibility} repositories:\n" + "\n".join(repo_names)
+        repos = self._rest_paged("/user/repos",
+                                 {"affiliation": "owner", "visibility": visibility},
+                                 max_results=max_results)
+        # Join straight from a generator and use the joined string itself
+        # for the emptiness check; no intermediate name list
+        body = "\n".join(r["full_name"] for r in repos)
+        if not body: return f"You have no '{visibility}' repositories."
+        return f"Your {visibility} repositories:\n" + body
 
     def create_repo(self, name: str, description: str = "", private: bool = False):
         """Creates a new repository."""
         try:
             repo = self.user.create_repo(name=name, description=description, private=private)
+            self._owned_repos = None
+            self._invalidate_reads()
             return f"Repository '{repo.full_name}' created successfully."
         except GithubException as e:
             if e.status == 422: return f"Error: Repository with name '{name}' might already exist."
             return f"Error creating repository: {e}"
 
+    def _owns_repo(self, repo_full_name):
+        """Checks ownership against the lazily built owned-repo set."""
+        if self._owned_repos is None:
+            repos = self._rest_paged("/user/repos", {"affiliation": "owner"})
+            self._owned_repos = {r["full_name"].lower() for r in repos}
+        return repo_full_name.lower() in self._owned_repos
+
     def delete_repo(self, repo_full_name: str):
         """Deletes a repository."""
+        if self._owns_repo(repo_full_name):
+            # Fast path: ownership answered locally, so delete directly
+            # without fetching the repo object first
+            response = self._limited_request("DELETE", f"/repos/{repo_full_name}", timeout=10)
+            if response.status_code == 204:
+                self._owned_repos.discard(repo_full_name.lower())
+                self._repo_cache.pop(repo_full_name, None)
+                self._invalidate_reads()
+                return f"Repository '{repo_full_name}' deleted successfully."
+            # The set was stale (repo gone or renamed elsewhere): rebuild it
+            # and fall through to the validated path below
+            self._owned_repos = None
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
-        if repo.owner.login != self.user.login: return "Error: You can only delete your own repository."
+        if repo.owner.login != self.user_login: return "Error: You can only delete your own repository."
         try:
             repo.delete()
+            self._repo_cache.pop(repo_full_name, None)
+            self._invalidate_reads()
             return f"Repository '{repo_full_name}' deleted successfully."
         except GithubException as e:
             return f"Error deleting repository: {e}"
@@ -76,50 +378,93 @@ class GitHubHandler:
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         try:
             forked_repo = self.user.create_fork(repo)
+            self._owned_repos = None
+            self._invalidate_reads()
             return f"Repository '{repo.full_name}' successfully forked as '{forked_repo.full_name}'."
         except GithubException as e:
             return f"Error forking repository: {e}"
 
+    def repo_stats_bulk(self, repo_full_names):
+        """Fetches stats for several repositories with one GraphQL query.
+
+        Returns a dict mapping each full name to its stats dict, or to None
+        if that repository could not be found.
+        """
+        fields = []
+        for idx, full_name in enumerate(repo_full_names):
+            owner, _, name = full_name.partition('/')
+            fields.append(
+                f'r{idx}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) '
+                '{ stargazerCount forkCount watchers { totalCount } primaryLanguage { name } }'
+            )
+        query = "query { " + " ".join(fields) + " }"
+        response = self._limited_request("POST", "/graphql", json={"query": query}, timeout=30)
+        data = response.json().get("data") or {}
+        stats = {}
+        for idx, full_name in enumerate(repo_full_names):
+            node = data.get(f"r{idx}")
+            if not node:
+                stats[full_name] = None
+                continue
+            language = node.get("primaryLanguage") or {}
+            stats[full_name] = {
+                "stars": node["stargazerCount"],
+                "forks": node["forkCount"],
+                "watchers": node["watchers"]["totalCount"],
+                "language": language.get("name"),
+            }
+        return stats
+
+    @_ttl_cache
     def get_repo_stats(self, repo_full_name: str):
         """Fetches repository statistics."""
-        repo = self._get_repo(repo_full_name)
-        if not repo: return f"Error: Repository '{repo_full_name}' not found."
-        return (f"Stats for '{repo.full_name}':\n"
-                f"  - Stars: {repo.stargazers_count}\n"
-                f"  - Forks: {repo.forks_count}\n"
-                f"  - Watchers: {repo.subscribers_count}\n"
-                f"  - Language: {repo.language}")
+        stats = self.repo_stats_bulk([repo_full_name]).get(repo_full_name)
+        if not stats:
+            return f"Error: Repository '{repo_full_name}' not found."
+        return _REPO_STATS_TMPL.format(full_name=repo_full_name, **stats)
 
     # --- File and Content Management ---
-    def list_files(self, repo_full_name: str, path: str = ""):
+    @_ttl_cache
+    def list_files(self, repo_full_name: str, path: str = "", max_results: int = 100):
         """Lists files and folders in a repository."""
-        repo = self._get_repo(repo_full_name)
-        if not repo: return f"Error: Repository '{repo_full_name}' not found."
+        repo = self._get_repo_lazy(repo_full_name)
         try:
             contents = repo.get_contents(path)
-            file_list = [f"[{item.type}] {item.name}" for item in contents]
-            return f"Contents of '{repo.full_name}/{path}':\n" + "\n".join(file_list)
+            # Feed join from a generator; no intermediate list of lines
+            file_list = "\n".join(f"[{item.type}] {item.name}"
+                                  for item in itertools.islice(contents, int(max_results)))
+            return f"Contents of '{repo_full_name}/{path}':\n" + file_list
         except UnknownObjectException:
-            return f"Error: Path '{path}' not found in '{repo.full_name}'."
+            # One 404 covers both a missing repo and a missing path
+            return f"Error: Path '{path}' not found in '{repo_full_name}'."
 
+    @_ttl_cache
     def get_file_content(self, repo_full_name: str, file_path: str):
         """Fetches content of a file."""
-        repo = self._get_repo(repo_full_name)
-        if not repo: return f"Error: Repository '{repo_full_name}' not found."
-        try:
-            file_content = repo.get_contents(file_path)
-            return f"--- Content of '{file_path}' ---\n{file_content.decoded_content.decode('utf-8')}"
-        except UnknownObjectException:
-            return f"Error: File '{file_path}' not found."
-        except GithubException:
+        # Ask for the raw blob: GitHub then sends the bytes directly instead
+        # of a JSON envelope with a base64 copy we would have to decode
+        response = self._rest_get(
+            f"/repos/{repo_full_name}/contents/{file_path}",
+            headers={"Accept": "application/vnd.github.v3.raw"},
+            timeout=30,
+        )
+        if response.status_code == 404:
+            return f"Error: File '{file_path}' not found in '{repo_full_name}'."
+        if "json" in response.headers.get("Content-Type", ""):
+            # Directories ignore the raw Accept header and come back as JSON
             return f"Error: Is '{file_path}' a folder? I can only read file content."
+        if not response.ok:
+            return f"Error reading file: HTTP {response.status_code}."
+        return f"--- Content of '{file_path}' ---\n{response.content.decode('utf-8', errors='replace')}"
 
     def create_file(self, repo_full_name: str, file_path: str, commit_message: str, content: str):
         """Creates a new file."""
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         try:
-            repo.create_file(file_path, commit_message, content)
+            result = repo.create_file(file_path, commit_message, content)
+            self._sha_cache[(repo_full_name, file_path)] = result["content"].sha
+            self._invalidate_reads(repo_full_name)
             return f"File '{file_path}' created successfully in '{repo.full_name}'."
         except GithubException as e:
             if e.status == 422: return f"Error: File '{file_path}' might already exist."
@@ -129,11 +474,25 @@ class GitHubHandler:
         """Updates an existing file."""
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
+        cache_key = (repo_full_name, file_path)
         try:
-            file_to_update = repo.get_contents(file_path)
-            repo.update_file(file_path, commit_message, content, file_to_update.sha)
+            sha = self._sha_cache.get(cache_key)
+            if sha is None:
+                sha = repo.get_contents(file_path).sha
+            try:
+                result = repo.update_file(file_path, commit_message, content, sha)
+            except GithubException as e:
+                if e.status not in (409, 422):
+                    raise
+                # Cached SHA went stale (file changed elsewhere); refetch once
+                self._sha_cache.pop(cache_key, None)
+                sha = repo.get_contents(file_path).sha
+                result = repo.update_file(file_path, commit_message, content, sha)
+            self._sha_cache[cache_key] = result["content"].sha
+            self._invalidate_reads(repo_full_name)
             return f"File '{file_path}' updated successfully in '{repo.full_name}'."
         except UnknownObjectException:
+            self._sha_cache.pop(cache_key, None)
             return f"Error: File '{file_path}' not found."
         except GithubException as e:
             return f"Error updating file: {e}"
@@ -142,21 +501,65 @@ class GitHubHandler:
         """Deletes a file."""
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
+        cache_key = (repo_full_name, file_path)
         try:
-            file_to_delete = repo.get_contents(file_path)
-            repo.delete_file(file_path, commit_message, file_to_delete.sha)
+            sha = self._sha_cache.pop(cache_key, None)
+            if sha is None:
+                sha = repo.get_contents(file_path).sha
+            try:
+                repo.delete_file(file_path, commit_message, sha)
+            except GithubException as e:
+                if e.status not in (409, 422):
+                    raise
+                # Cached SHA went stale; refetch once
+                sha = repo.get_contents(file_path).sha
+                repo.delete_file(file_path, commit_message, sha)
+            self._invalidate_reads(repo_full_name)
             return f"File '{file_path}' deleted successfully."
         except UnknownObjectException:
             return f"Error: File '{file_path}' not found."
         except GithubException as e:
             return f"Error deleting file: {e}"
 
+    def commit_files(self, repo_full_name: str, changes: list, commit_message: str, branch: str = 'main'):
+        """Creates or updates several files in one commit via the Git Data API.
+
+        changes is a list of {'file_path', 'content'} dicts. Packing them
+        into a single tree costs four round-trips in total instead of one
+        commit (and one request) per file, and keeps the history to one
+        commit per agent step.
+        """
+        repo = self._get_repo(repo_full_name)
+        if not repo: return f"Error: Repository '{repo_full_name}' not found."
+        if not changes: return "Error: No file changes provided."
+        try:
+            ref = repo.get_git_ref(f'heads/{branch}')
+            base_commit = repo.get_git_commit(ref.object.sha)
+            # Passing content directly lets GitHub create the blobs while
+            # building the tree, so no per-file blob requests are needed
+            elements = [InputGitTreeElement(change['file_path'], '100644', 'blob',
+                                            content=change['content'])
+                        for change in changes]
+            tree = repo.create_git_tree(elements, base_tree=base_commit.tree)
+            commit = repo.create_git_commit(commit_message, tree, [base_commit])
+            ref.edit(commit.sha)
+            for change in changes:
+                self._sha_cache.pop((repo_full_name, change['file_path']), None)
+            self._invalidate_reads(repo_full_name)
+            return (f"Committed {len(changes)} files to '{branch}' in '{repo_full_name}' "
+                    f"as a single commit.")
+        except UnknownObjectException:
+            return f"Error: Branch '{branch}' not found in '{repo_full_name}'."
+        except GithubException as e:
+            return f"Error committing files: {e}"
+
     # --- Collaborator Operations ---
-    def list_collaborators(self, repo_full_name: str):
+    @_ttl_cache
+    def list_collaborators(self, repo_full_name: str, max_results: int = 100):
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         collaborators = repo.get_collaborators()
-        logins = [c.login for c in collaborators]
+        logins = _parallel_map(collaborators, lambda c: _raw(c, "login"), limit=max_results)
         if not logins: return f"No collaborators found in '{repo.full_name}'."
         return f"Collaborators in '{repo.full_name}':\n" + "\n".join(logins)
 
@@ -165,6 +568,7 @@ class GitHubHandler:
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         try:
             repo.add_to_collaborators(username, permission=permission)
+            self._invalidate_reads(repo_full_name)
             return f"Invitation sent to user '{username}' as collaborator in '{repo.full_name}'."
         except GithubException as e:
             return f"Error adding collaborator: {e}"
@@ -174,6 +578,7 @@ class GitHubHandler:
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         try:
             repo.remove_from_collaborators(username)
+            self._invalidate_reads(repo_full_name)
             return f"User '{username}' removed as collaborator from '{repo.full_name}'."
         except GithubException as e:
             return f"Error removing collaborator: {e}"
@@ -184,15 +589,17 @@ class GitHubHandler:
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         try:
             issue = repo.create_issue(title=title, body=body, assignee=assignee)
+            self._invalidate_reads(repo_full_name)
             return f"Issue #{issue.number} ('{title}') created successfully."
         except GithubException as e:
             return f"Error creating issue: {e}"
 
-    def list_issues(self, repo_full_name: str, state: str = 'open'):
+    @_ttl_cache
+    def list_issues(self, repo_full_name: str, state: str = 'open', max_results: int = 100):
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
         issues = repo.get_issues(state=state)
-        issue_list = [f"#{i.number}: {i.title}" for i in issues]
+        issue_list = _parallel_map(issues, lambda i: f"#{i.number}: {i.title}", limit=max_results)
         if not issue_list: return f"No '{state}' issues found in '{repo.full_name}'."
         return f"{state.capitalize()} issues in '{repo.full_name}':\n" + "\n".join(issue_list)
 
@@ -202,6 +609,7 @@ class GitHubHandler:
         try:
             issue = repo.get_issue(issue_number)
             issue.edit(state='closed')
+            self._invalidate_reads(repo_full_name)
             return f"Issue #{issue_number} closed successfully."
         except UnknownObjectException:
             return f"Error: Issue #{issue_number} not found."
@@ -209,10 +617,11 @@ class GitHubHandler:
             return f"Error closing issue: {e}"
 
     # --- Branches ---
-    def list_branches(self, repo_full_name: str):
+    @_ttl_cache
+    def list_branches(self, repo_full_name: str, max_results: int = 100):
         repo = self._get_repo(repo_full_name)
         if not repo: return f"Error: Repository '{repo_full_name}' not found."
-        branches = [b.name for b in repo.get_branches()]
+        branches = _parallel_map(repo.get_branches(), lambda b: b.name, limit=max_results)
         return f"Branches in '{repo.full_name}':\n" + "\n".join(branches)
 
     def create_branch(self, repo_full_name: str, branch_name: str, source_branch: str = 'main'):
@@ -221,20 +630,25 @@ class GitHubHandler:
         try:
             source = repo.get_branch(source_branch)
             repo.create_git_ref(ref=f'refs/heads/{branch_name}', sha=source.commit.sha)
+            self._invalidate_reads(repo_full_name)
             return f"Branch '{branch_name}' created successfully from '{source_branch}'."
         except GithubException as e:
             if e.status == 422: return f"Error: Branch '{branch_name}' might already exist."
             return f"Error creating branch: {e}"
 
     # --- Search ---
+    @_ttl_cache
     def search_repos(self, query: str):
-        repos = self.g.search_repositories(query)
-        repo_list = [r.full_name for r in repos[:10]] # Show top 10 only
-        if not repo_list: return f"No repositories found for '{query}'."
-        return f"Search results for '{query}':\n" + "\n".join(repo_list)
+        # One GET with per_page=10 returns exactly the top 10 results
+        response = self._rest_get("/search/repositories", {"q": query, "per_page": 10})
+        items = response.json().get("items", []) if response.ok else []
+        if not items: return f"No repositories found for '{query}'."
+        return f"Search results for '{query}':\n" + "\n".join(i["full_name"] for i in items)
 
+    @_ttl_cache
     def search_users(self, query: str):
-        users = self.g.search_users(query)
-        user_list = [u.login for u in users[:10]] # Show top 10 only
-        if not user_list: return f"No users found for '{query}'."
-        return f"Search results for '{query}':\n" + "\n".join(user_list)
+        # One GET with per_page=10 returns exactly the top 10 results
+        response = self._rest_get("/search/users", {"q": query, "per_page": 10})
+        items = response.json().get("items", []) if response.ok else []
+        if not items: return f"No users found for '{query}'."
+        return f"Search results for '{query}':\n" + "\n".join(i["login"] for i in items)
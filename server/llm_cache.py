@@ -0,0 +1,75 @@
+# server/llm_cache.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(model_name, prompt, tool_names):
+    """Builds a stable cache key for a (model, prompt, tools) combination."""
+    payload = json.dumps(
+        {"model": model_name, "prompt": prompt, "tools": sorted(tool_names)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """In-memory LRU cache with a TTL for deterministic LLM results.
+
+    Values must be JSON-serialisable so the Redis backend below can store
+    the same payloads.
+    """
+
+    def __init__(self, maxsize=1024, ttl=600):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if time.monotonic() >= expires:
+                del self._data[key]
+                return None
+            # Refresh LRU position on hit
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Stores value under key, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+class RedisLLMCache:
+    """Redis-backed cache for multi-process deployments.
+
+    Requires the optional `redis` package; values are stored as JSON.
+    """
+
+    def __init__(self, url, ttl=3600):
+        import redis  # Imported lazily so the package stays optional
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        raw = self._client.get(key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key, value):
+        """Stores value under key with the configured TTL."""
+        self._client.set(key, json.dumps(value), ex=self._ttl)
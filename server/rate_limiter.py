@@ -0,0 +1,65 @@
+# server/rate_limiter.py
+
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """Client-side throttle for the GitHub API.
+
+    Enforces a sliding-window request budget per resource (core: 5000/hr,
+    search: 30/min) and bounds in-flight concurrency, so bursty agent
+    traffic slows itself down before GitHub starts answering with
+    secondary-rate-limit 403s. Retry-After responses are fed back in via
+    update() and pause the matching resource.
+    """
+
+    #: requests allowed per window, seconds per window
+    BUDGETS = {"core": (5000, 3600.0), "search": (30, 60.0)}
+
+    def __init__(self, max_concurrency=10):
+        self._concurrency = threading.Semaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._history = {name: deque() for name in self.BUDGETS}
+        self._paused_until = {name: 0.0 for name in self.BUDGETS}
+
+    def acquire(self, resource="core"):
+        """Blocks until a request against resource may be sent."""
+        self._concurrency.acquire()
+        try:
+            limit, window = self.BUDGETS[resource]
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    history = self._history[resource]
+                    while history and now - history[0] > window:
+                        history.popleft()
+                    wait = self._paused_until[resource] - now
+                    if wait <= 0 and len(history) < limit:
+                        history.append(now)
+                        return
+                    if wait <= 0:
+                        # Budget exhausted: wait for the oldest entry to age out
+                        wait = history[0] + window - now
+                time.sleep(min(max(wait, 0.05), 5.0))
+        except BaseException:
+            self._concurrency.release()
+            raise
+
+    def release(self):
+        """Returns the concurrency slot once the response has arrived."""
+        self._concurrency.release()
+
+    def update(self, headers, resource="core"):
+        """Feeds a response's Retry-After header back into the throttle."""
+        retry_after = headers.get("Retry-After")
+        if not retry_after:
+            return
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            return
+        with self._lock:
+            self._paused_until[resource] = max(self._paused_until[resource],
+                                               time.monotonic() + delay)
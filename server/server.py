@@ -1,11 +1,27 @@
 # server/server.py
+import asyncio
+import hashlib
 import os
+import threading
+import types
 import webbrowser
+import orjson
 import requests
-from flask import Flask, request, jsonify, redirect
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, request, redirect
+from flask_caching import Cache
 from dotenv import load_dotenv
 from github_handler import GitHubHandler
-from gemini_handler import GeminiHandler
+from gemini_handler import GeminiHandler, TOOL_NAMES
+
+# Tool name -> GitHubHandler method, resolved once at import. Dispatching
+# through this dict is O(1) and doubles as the whitelist of operations the
+# model may trigger; a tool without a matching method fails right here.
+# The proxy keeps the whitelist read-only after startup.
+DISPATCH = types.MappingProxyType(
+    {name: getattr(GitHubHandler, name) for name in TOOL_NAMES})
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,14 +29,116 @@ load_dotenv()
 # Initialize the Flask app
 app = Flask(__name__)
 
+
+def ojsonify(obj):
+    """Serialises a JSON response with orjson (several times faster than
+    the stdlib encoder Flask's jsonify uses)."""
+    return app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+# Shared session for outbound calls (OAuth token exchange): keeps the
+# TLS connection to github.com alive across logins instead of paying a
+# fresh handshake per callback
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+))
+
 # GitHub OAuth app credentials
 GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
 GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Store authentication tokens in memory (use a database in production)
-# This is a simple way to manage user sessions
-user_tokens = {}
+# The authorize URL is identical per login except for the state, so the
+# constant part is assembled once at import; /login only fills in state
+_AUTH_URL_TMPL = (
+    f"https://github.com/login/oauth/authorize?client_id={GITHUB_CLIENT_ID}"
+    "&scope=repo,delete_repo,user&state={state}"
+)
+
+# Authentication tokens live in a shared cache so every worker sees the
+# same logins: Redis when REDIS_URL is set, an in-process SimpleCache
+# for local development
+if os.getenv("REDIS_URL"):
+    cache = Cache(app, config={"CACHE_TYPE": "RedisCache",
+                               "CACHE_REDIS_URL": os.getenv("REDIS_URL")})
+else:
+    cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+
+# How long a stored token stays valid (seconds)
+TOKEN_TTL = 28800
+
+
+def _store_token(user_id, token):
+    cache.set(f"tok:{user_id}", token, timeout=TOKEN_TTL)
+
+
+def _get_token(user_id):
+    return cache.get(f"tok:{user_id}")
+
+
+def _delete_token(user_id):
+    cache.delete(f"tok:{user_id}")
+
+# One GitHubHandler per token: constructing one costs a GET /user round
+# trip, so reuse the authenticated client (and its pooled connections)
+# across requests. The lock matters because Flask serves threads.
+_handler_cache = TTLCache(maxsize=1024, ttl=3600)
+_handler_lock = threading.Lock()
+
+
+def _get_handler(token):
+    """Returns the cached GitHubHandler for this token, creating it once."""
+    with _handler_lock:
+        handler = _handler_cache.get(token)
+    if handler is not None:
+        return handler
+    handler = GitHubHandler(token)
+    with _handler_lock:
+        return _handler_cache.setdefault(token, handler)
+
+
+def _drop_handler(token):
+    """Forgets a cached handler, e.g. after its token turned out invalid."""
+    with _handler_lock:
+        _handler_cache.pop(token, None)
+
+
+# Tool-calls keyed by a hash of the normalised prompt; a hit skips the
+# Gemini round-trip, which dominates /chat latency. The Gemini layer has
+# its own exact-match cache, this one also catches case and whitespace
+# variants of a repeated prompt. Only prompts sent to a history-free
+# session are cached: with context, 'delete it' means different things
+# to different users, and replaying another user's resolution could
+# fire a destructive action with foreign arguments.
+_fn_cache = TTLCache(maxsize=4096, ttl=600)
+_fn_cache_lock = threading.Lock()
+
+
+def _prompt_key(prompt):
+    """Hashes a prompt, ignoring case and surrounding whitespace."""
+    return hashlib.blake2b(prompt.strip().lower().encode("utf-8"), digest_size=16).digest()
+
+
+# The client polls /check_auth, but the user's own profile barely
+# changes; a short cache keyed by token turns most polls into a dict
+# lookup instead of an API call
+_userinfo_cache = TTLCache(maxsize=1024, ttl=30)
+_userinfo_lock = threading.Lock()
+
+
+def _get_user_info(token):
+    """Returns the user-info payload for this token, cached for 30s."""
+    with _userinfo_lock:
+        user_info = _userinfo_cache.get(token)
+    if user_info is not None:
+        return user_info
+    handler = _get_handler(token)
+    user_info = handler.get_user_info()
+    with _userinfo_lock:
+        _userinfo_cache[token] = user_info
+    return user_info
 
 # Initialize Gemini handler
 try:
@@ -42,11 +160,7 @@ def login():
     # Use a 'state' parameter to identify the user
     # For this example, we use a default user_id = 'main_user'
     user_id = "main_user"
-    github_auth_url = (
-        f"https://github.com/login/oauth/authorize?client_id={GITHUB_CLIENT_ID}"
-        f"&scope=repo,delete_repo,user&state={user_id}"
-    )
-    return redirect(github_auth_url)
+    return redirect(_AUTH_URL_TMPL.format(state=user_id))
 
 @app.route('/callback')
 def callback():
@@ -63,16 +177,17 @@ def callback():
         'code': session_code
     }
     
-    response = requests.post(token_url, headers=headers, data=payload)
+    response = SESSION.post(token_url, headers=headers, data=payload, timeout=10)
     response_data = response.json()
     
-    print("DEBUG: GitHub token response:", response_data)
+    # Log only the response shape; the raw token must never reach a log
+    app.logger.debug("GitHub token response keys: %s", list(response_data.keys()))
 
     access_token = response_data.get('access_token')
     
     if access_token:
         # Store the token with the user's state (user_id)
-        user_tokens[state] = access_token
+        _store_token(state, access_token)
         print(f"Token successfully obtained for user '{state}'.")
         return "Authentication successful! You can close this window and return to the client."
     else:
@@ -82,63 +197,80 @@ def callback():
 # --- API Routes ---
 
 @app.route('/check_auth')
-def check_auth():
+async def check_auth():
     """Checks if the user is authenticated."""
     user_id = request.args.get('user_id', 'main_user')
-    if user_id in user_tokens:
+    token = _get_token(user_id)
+    if token:
         try:
-            handler = GitHubHandler(user_tokens[user_id])
-            user_info = handler.get_user_info()
-            return jsonify({"logged_in": True, "user": user_info})
+            user_info = await asyncio.to_thread(_get_user_info, token)
+            return ojsonify({"logged_in": True, "user": user_info})
         except Exception as e:
             # If the token is invalid, remove it
-            del user_tokens[user_id]
-            return jsonify({"logged_in": False, "error": f"Invalid token: {e}"})
-    return jsonify({"logged_in": False})
+            _drop_handler(token)
+            _delete_token(user_id)
+            return ojsonify({"logged_in": False, "error": f"Invalid token: {e}"})
+    return ojsonify({"logged_in": False})
 
 
 @app.route('/chat', methods=['POST'])
-def chat():
+async def chat():
     """Handles chat messages from the client."""
-    data = request.json
+    try:
+        data = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        return ojsonify({"response": "Invalid request: the body must be a JSON object."}), 400
     user_id = data.get('user_id', 'main_user')
     prompt = data.get('prompt')
 
     if not prompt:
-        return jsonify({"response": "Please provide a message so I can understand."}), 400
+        return ojsonify({"response": "Please provide a message so I can understand."}), 400
 
-    if user_id not in user_tokens:
-        return jsonify({"response": "You are not logged in. Please log in first."}), 401
+    token = _get_token(user_id)
+    if token is None:
+        return ojsonify({"response": "You are not logged in. Please log in first."}), 401
 
     if not gemini:
-        return jsonify({"response": "Gemini handler is not properly configured."}), 500
+        return ojsonify({"response": "Gemini handler is not properly configured."}), 500
 
     try:
-        # Get the function call from Gemini
-        function_call = gemini.get_github_operation(prompt)
-        
+        # Get the function call from Gemini (or the prompt cache);
+        # ?nocache=1 forces a fresh LLM round-trip for debugging. The
+        # cache only applies while the user's session has no history --
+        # contextual prompts must always reach the model.
+        use_cache = (request.args.get('nocache') != '1'
+                     and gemini.session_is_fresh(user_id))
+        cache_key = _prompt_key(prompt)
+        function_call = None
+        if use_cache:
+            with _fn_cache_lock:
+                function_call = _fn_cache.get(cache_key)
+        if function_call is None:
+            function_call = await gemini.get_github_operation_async(prompt, user_id)
+            if function_call and use_cache:
+                with _fn_cache_lock:
+                    _fn_cache[cache_key] = function_call
+
         if not function_call:
             # If no specific function was found, return a general response
-            return jsonify({"response": "I couldn't understand which GitHub action to perform. Please clarify."})
+            return ojsonify({"response": "I couldn't understand which GitHub action to perform. Please clarify."})
 
-        # Initialize the GitHub handler
-        handler = GitHubHandler(user_tokens[user_id])
-        
-        # Determine which function to call and its parameters
-        function_name = function_call.name
-        function_args = {key: value for key, value in function_call.args.items()}
+        # Get the (cached) GitHub handler
+        handler = await asyncio.to_thread(_get_handler, token)
         
-        # Dynamically call the method on the GitHub handler
-        if hasattr(handler, function_name):
-            method_to_call = getattr(handler, function_name)
-            result = method_to_call(**function_args)
-            return jsonify({"response": result})
-        else:
-            return jsonify({"response": f"Error: No action named '{function_name}' found."}), 400
+        # Look the method up in the precomputed dispatch table; args is
+        # already a plain dict, so it unpacks directly
+        method_to_call = DISPATCH.get(function_call.name)
+        if method_to_call is None:
+            return ojsonify({"response": f"Error: No action named '{function_call.name}' found."}), 400
+        result = await asyncio.to_thread(method_to_call, handler, **function_call.args)
+        return ojsonify({"response": result})
 
     except Exception as e:
         print(f"Error while processing chat: {e}")
-        return jsonify({"response": f"An unexpected error occurred: {str(e)}"}), 500
+        return ojsonify({"response": f"An unexpected error occurred: {str(e)}"}), 500
 
 
 if __name__ == '__main__':
@@ -146,7 +278,3 @@ if __name__ == '__main__':
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
     # Run the app
     app.run(port=5000, debug=True)
-    print("Client ID:", GITHUB_CLIENT_ID)
-    print("Client Secret:", GITHUB_CLIENT_SECRET)
-    
-    
\ No newline at end of file
@@ -0,0 +1,9 @@
+# server/wsgi.py
+
+# Production entry point. The Flask dev server (python server.py) restarts
+# on reload and serves one request at a time; run this module under a real
+# WSGI server instead, e.g.:
+#
+#   gunicorn -w 2 -k gthread --threads 16 wsgi:app
+#
+from server import app  # noqa: F401